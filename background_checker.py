@@ -3,13 +3,22 @@ Check for background assets and create a sample background if none exists.
 """
 import os
 import sys
-import numpy as np
 from PIL import Image
 
+from file_types import BACKGROUND_EXTENSIONS, FONT_EXTENSIONS, list_files
+
+# Asset directories
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKGROUNDS_DIR = os.path.join(PROJECT_DIR, "assets", "backgrounds")
+FONTS_DIR = os.path.join(PROJECT_DIR, "assets", "fonts")
+
+# Sample background settings (blue matching the old gradient's midpoint)
+SAMPLE_BACKGROUND_SIZE = (16, 16)
+SAMPLE_BACKGROUND_COLOR = (25, 76, 204)
+
 def check_backgrounds():
     """Check for background assets and create a sample if none exists."""
-    project_dir = os.path.dirname(os.path.abspath(__file__))
-    backgrounds_dir = os.path.join(project_dir, "assets", "backgrounds")
+    backgrounds_dir = BACKGROUNDS_DIR
     
     # Create the backgrounds directory if it doesn't exist
     if not os.path.exists(backgrounds_dir):
@@ -17,37 +26,19 @@ def check_backgrounds():
         os.makedirs(backgrounds_dir, exist_ok=True)
     
     # Check if there are any background files
-    background_files = [f for f in os.listdir(backgrounds_dir) 
-                       if f.endswith(('.mp4', '.mov', '.avi', '.png', '.jpg', '.jpeg'))]
+    background_files = list_files(backgrounds_dir, BACKGROUND_EXTENSIONS)
     
     if not background_files:
         print("No background files found. Creating a sample background image...")
         
-        # Create a simple gradient background
-        width, height = 1080, 1920
-        
-        # Create a gradient array
-        x = np.linspace(0, 1, width)
-        y = np.linspace(0, 1, height)
-        X, Y = np.meshgrid(x, y)
-        Z = (X + Y) / 2.0
-        
-        # Convert to RGB image
-        img_array = np.stack([
-            Z * 0 + 0.1,  # R channel - dark blue
-            Z * 0.2 + 0.2,  # G channel - medium blue
-            Z * 0.4 + 0.6  # B channel - light blue gradient
-        ], axis=2)
-        
-        # Scale to 0-255 and convert to uint8
-        img_array = (img_array * 255).astype(np.uint8)
-        
-        # Create the PIL image
-        img = Image.fromarray(img_array)
+        # Create a small solid-color background; the video pipeline scales
+        # backgrounds to the output size, so there is no need to render or
+        # encode a full-resolution image here
+        img = Image.new('RGB', SAMPLE_BACKGROUND_SIZE, SAMPLE_BACKGROUND_COLOR)
         
         # Save the image
         background_path = os.path.join(backgrounds_dir, "sample_background.jpg")
-        img.save(background_path)
+        img.save(background_path, 'JPEG', quality=80, optimize=False, subsampling=2)
         
         print(f"Created sample background image: {background_path}")
         
@@ -61,8 +52,7 @@ def check_backgrounds():
 
 def check_fonts():
     """Check for font files and create the fonts directory if it doesn't exist."""
-    project_dir = os.path.dirname(os.path.abspath(__file__))
-    fonts_dir = os.path.join(project_dir, "assets", "fonts")
+    fonts_dir = FONTS_DIR
     
     # Create the fonts directory if it doesn't exist
     if not os.path.exists(fonts_dir):
@@ -70,8 +60,7 @@ def check_fonts():
         os.makedirs(fonts_dir, exist_ok=True)
     
     # Check if there are any font files
-    font_files = [f for f in os.listdir(fonts_dir) 
-                 if f.endswith(('.ttf', '.otf'))]
+    font_files = list_files(fonts_dir, FONT_EXTENSIONS)
     
     if not font_files:
         print("No font files found. The program will use the system default font.")
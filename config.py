@@ -27,14 +27,28 @@ VIDEO_FPS = 30
 VIDEO_DURATION = 60  # Max duration in seconds
 
 # Path settings
-ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(PROJECT_DIR, 'assets')
 BACKGROUND_DIR = os.path.join(ASSETS_DIR, 'backgrounds')
 FONTS_DIR = os.path.join(ASSETS_DIR, 'fonts')
-OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
+OUTPUT_DIR = os.path.join(PROJECT_DIR, 'output')
+CACHE_DIR = os.path.join(PROJECT_DIR, '.cache')
+REDDIT_CACHE_DIR = os.path.join(CACHE_DIR, 'reddit')
+TTS_CACHE_DIR = os.path.join(CACHE_DIR, 'tts')
+BACKGROUND_CACHE_DIR = os.path.join(CACHE_DIR, 'backgrounds')
 
-# Create directories if they don't exist
-for directory in [ASSETS_DIR, BACKGROUND_DIR, FONTS_DIR, OUTPUT_DIR]:
-    os.makedirs(directory, exist_ok=True)
+# Asset file extensions and listing helper (defined in file_types)
+from file_types import VIDEO_EXTENSIONS, IMAGE_EXTENSIONS, BACKGROUND_EXTENSIONS, FONT_EXTENSIONS, list_files
+
+# Directories already created by ensure_directories in this process
+_ensured_dirs = set()
+
+def ensure_directories():
+    """Create the asset and output directories if they don't exist."""
+    for directory in (ASSETS_DIR, BACKGROUND_DIR, FONTS_DIR, OUTPUT_DIR):
+        if directory not in _ensured_dirs:
+            os.makedirs(directory, exist_ok=True)
+            _ensured_dirs.add(directory)
 
 # Text settings
 DEFAULT_FONT = os.path.join(FONTS_DIR, 'arial.ttf')
@@ -42,4 +56,30 @@ TEXT_COLOR = 'white'
 SHADOW_COLOR = 'black'
 
 # TTS settings
-TTS_RATE = 175  # Words per minute
\ No newline at end of file
+TTS_RATE = 175  # Words per minute
+TTS_MAX_WORKERS = 8  # Parallel workers used for batch conversion
+PIPER_MODEL_PATH = os.getenv('PIPER_MODEL_PATH')  # Piper .onnx voice model (optional, replaces pyttsx3)
+TTS_CACHE_MAX_BYTES = 500 * 1024 * 1024  # Least recently used audio is evicted above this size
+
+# Reddit cache settings (seconds a cached response stays fresh)
+REDDIT_CACHE_TTL = {
+    'hour': 60,
+    'day': 300,
+    'week': 1800,
+    'month': 3600,
+    'year': 6 * 3600,
+    'all': 24 * 3600,
+}
+REDDIT_COMMENTS_CACHE_TTL = 300
+
+# Reddit rate limiting: below this many remaining requests in the current
+# window, requests are spaced out until the window resets
+REDDIT_RATELIMIT_THRESHOLD = 10
+
+# Reddit retry settings for transient errors (exponential backoff with jitter)
+REDDIT_MAX_RETRIES = 5
+REDDIT_RETRY_BASE_DELAY = 1.0  # Seconds
+REDDIT_RETRY_MAX_DELAY = 30.0  # Seconds
+
+# Threads in the Reddit client's shared fetch pool
+REDDIT_MAX_WORKERS = 6
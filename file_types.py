@@ -0,0 +1,21 @@
+"""
+Asset file extensions and directory listing helpers.
+
+Kept free of third-party imports (and of config's .env loading) so that
+standalone scripts such as structure.py and background_checker.py can use
+them. config re-exports everything here.
+"""
+import os
+
+# Recognised asset file extensions (compared lowercased)
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.mov', '.avi', '.mkv'})
+IMAGE_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg'})
+BACKGROUND_EXTENSIONS = VIDEO_EXTENSIONS | IMAGE_EXTENSIONS
+FONT_EXTENSIONS = frozenset({'.ttf', '.otf'})
+
+def list_files(directory, extensions):
+    """Return the names of files in directory with one of the given extensions."""
+    # scandir answers is_file() from the directory listing, without a stat per file
+    with os.scandir(directory) as entries:
+        return [entry.name for entry in entries
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in extensions]
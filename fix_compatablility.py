@@ -6,53 +6,57 @@ import os
 import re
 import glob
 
-def fix_antialias_issue(file_path):
-    """Replace ANTIALIAS with newer LANCZOS constant in the file."""
-    with open(file_path, 'r', encoding='utf-8') as file:
-        content = file.read()
+# Patterns for the deprecated Pillow APIs
+ANTIALIAS_PATTERN = re.compile(r'((?:PIL\.)?Image)\.ANTIALIAS')
+TEXTSIZE_PATTERN = re.compile(r'(\w+)\.textsize\(([^,]+),\s*([^)]+)\)')
+
+def _rewrite_file(file_path, rewrite):
+    """
+    Apply rewrite(content) -> (updated_content, count) to the file.
     
-    # Replace ANTIALIAS with LANCZOS
-    updated_content = re.sub(r'PIL\.Image\.ANTIALIAS', 'PIL.Image.LANCZOS', content)
-    updated_content = re.sub(r'Image\.ANTIALIAS', 'Image.LANCZOS', updated_content)
+    The file is only written back when at least one replacement was made.
+    Returns True if the file was changed.
+    """
+    with open(file_path, 'r+', encoding='utf-8') as file:
+        content = file.read()
+        updated_content, count = rewrite(content)
+        
+        if count:
+            file.seek(0)
+            file.truncate()
+            file.write(updated_content)
     
-    with open(file_path, 'w', encoding='utf-8') as file:
-        file.write(updated_content)
+    return count > 0
+
+def fix_antialias_issue(file_path):
+    """Replace ANTIALIAS with newer LANCZOS constant in the file."""
+    return _rewrite_file(file_path, lambda content: ANTIALIAS_PATTERN.subn(r'\1.LANCZOS', content))
 
 def fix_textsize_issue(file_path):
     """Replace textsize with getbbox/getsize in the file."""
-    with open(file_path, 'r', encoding='utf-8') as file:
-        content = file.read()
-    
-    # Pattern to find draw.textsize(text, font) calls
-    pattern = r'(\w+)\.textsize\(([^,]+),\s*([^)]+)\)'
-    
     def replace_textsize(match):
         draw_obj = match.group(1)
         text = match.group(2)
         font = match.group(3)
         return f"{font}.getsize({text})"
     
-    updated_content = re.sub(pattern, replace_textsize, content)
-    
-    with open(file_path, 'w', encoding='utf-8') as file:
-        file.write(updated_content)
+    return _rewrite_file(file_path, lambda content: TEXTSIZE_PATTERN.subn(replace_textsize, content))
 
 def find_python_files(directory):
-    """Find all Python files in the directory and subdirectories."""
-    return glob.glob(os.path.join(directory, '**', '*.py'), recursive=True)
+    """Lazily yield all Python files in the directory and subdirectories."""
+    yield from glob.iglob(os.path.join(directory, '**', '*.py'), recursive=True)
 
 def apply_fixes():
     # Get the project directory
     project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
     
-    # Find all Python files
-    python_files = find_python_files(project_dir)
-    
-    for file_path in python_files:
+    # Process Python files as they are found
+    for file_path in find_python_files(project_dir):
         print(f"Processing: {file_path}")
-        fix_antialias_issue(file_path)
-        fix_textsize_issue(file_path)
-        print(f"Updated: {file_path}")
+        antialias_fixed = fix_antialias_issue(file_path)
+        textsize_fixed = fix_textsize_issue(file_path)
+        if antialias_fixed or textsize_fixed:
+            print(f"Updated: {file_path}")
 
 if __name__ == "__main__":
     print("Applying compatibility fixes for newer Pillow versions...")
@@ -8,43 +8,52 @@ from PIL import Image
 if not hasattr(Image, 'ANTIALIAS'):
     Image.ANTIALIAS = Image.LANCZOS
 import argparse
-import logging
+import atexit
 import time
 import tempfile
 import datetime
+import functools
+import multiprocessing
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 # Import modules
+import config
 from reddit.reddit_client import RedditClient
 from tts.tts_engine import TTSEngine
 from video.background import BackgroundManager
 from video.text_overlay import TextOverlayGenerator
 from video.compositor import VideoCompositor
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger("**main**")
 
 # Constants
 DEFAULT_OUTPUT_DIR = "output"
-ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(PROJECT_DIR, "assets")
 BACKGROUNDS_DIR = os.path.join(ASSETS_DIR, "backgrounds")
 FONTS_DIR = os.path.join(ASSETS_DIR, "fonts")
 DEFAULT_FONT = os.path.join(FONTS_DIR, "arial.ttf")
 
-def generate_video(subreddit_name, time_filter="day", output_dir=DEFAULT_OUTPUT_DIR):
-    """Generate a video from a Reddit post with comments."""
-    start_time = time.time()
-    
-    # Initialize components
+@functools.lru_cache(maxsize=1)
+def get_components():
+    """Create the pipeline components once so repeated generate_video calls reuse them."""
     reddit_client = RedditClient()
     tts_engine = TTSEngine()
     background_manager = BackgroundManager(BACKGROUNDS_DIR)
     text_overlay = TextOverlayGenerator(font_path=DEFAULT_FONT)
-    compositor = VideoCompositor()
+    compositor = VideoCompositor(background_manager=background_manager, text_overlay=text_overlay)
+    return reddit_client, tts_engine, background_manager, text_overlay, compositor
+
+def generate_video(subreddit_name, time_filter="day", output_dir=DEFAULT_OUTPUT_DIR):
+    """Generate a video from a Reddit post with comments."""
+    start_time = time.time()
+    
+    # Create asset directories if they don't exist
+    config.ensure_directories()
+    
+    # Initialize components (created on the first call and reused afterwards)
+    reddit_client, tts_engine, background_manager, text_overlay, compositor = get_components()
     
     # Create output directory if it doesn't exist
     Path(output_dir).mkdir(parents=True, exist_ok=True)
@@ -64,7 +73,9 @@ def generate_video(subreddit_name, time_filter="day", output_dir=DEFAULT_OUTPUT_
     # Select the first post and get its comments
     post = posts[0]
     logger.info(f"Fetching comments for post: {post['title']}")  # Modified to use dictionary access
-    comments = reddit_client.get_top_comments(post, limit=10)
+    
+    # Fetch comments in the background so the request overlaps with audio generation
+    comments_future = reddit_client.get_top_comments_async(post, limit=10)
     
     # Process content into segments (post + comments)
     logger.info("Processing content into segments")
@@ -85,13 +96,19 @@ def generate_video(subreddit_name, time_filter="day", output_dir=DEFAULT_OUTPUT_
     
     # Generate audio for segments
     logger.info("Generating audio for segments")
-    temp_audio_files = []
+    
+    # Synthesize each distinct text once; segments with identical text share the file
+    unique_texts = list(dict.fromkeys(segment["text"] for segment in segments))
+    audio_by_text = dict(zip(unique_texts, tts_engine.text_to_speech_batch(unique_texts)))
     
     for segment in segments:
-        audio_file = tts_engine.text_to_speech(segment["text"])
+        audio_file = audio_by_text[segment["text"]]
         if audio_file:
             segment["audio"] = audio_file
-            temp_audio_files.append(audio_file)
+    
+    temp_audio_files = [audio_file for audio_file in audio_by_text.values() if audio_file]
+    
+    comments = comments_future.result()
     
     # Generate the video
     logger.info("Generating video")
@@ -114,8 +131,36 @@ def generate_video(subreddit_name, time_filter="day", output_dir=DEFAULT_OUTPUT_
         elapsed_time = time.time() - start_time
         logger.info(f"Video generation completed in {elapsed_time:.2f} seconds")
 
+def setup_logging():
+    """
+    Send log records to the console and app.log.
+    
+    Records go onto a queue and are formatted and written by a background
+    listener thread, so log I/O stays off the processing thread. The queue is
+    a multiprocessing one: pool workers install a QueueHandler on it (see
+    worker_logging) so their records reach the same listener. Only called
+    from main(): worker processes re-import this module and must not open
+    their own app.log handle and listener.
+    """
+    log_queue = multiprocessing.get_context("spawn").Queue(-1)
+    # Not basicConfig: it would give the queue handler a formatter too, and the
+    # listener's handlers would then format every record a second time
+    root_logger = logging.getLogger()
+    root_logger.addHandler(QueueHandler(log_queue))
+    root_logger.setLevel(logging.INFO)
+    
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handlers = [logging.StreamHandler(), logging.FileHandler("app.log")]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    log_listener = QueueListener(log_queue, *handlers)
+    log_listener.start()
+    atexit.register(log_listener.stop)
+
 def main():
     """Main function."""
+    setup_logging()
+    
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="Generate a video from a Reddit post with comments.")
     parser.add_argument("subreddit", help="Subreddit name (without the r/)")
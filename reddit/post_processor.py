@@ -1,6 +1,29 @@
 import re
+import html
 from typing import Dict, List, Any
 
+# Markup removed by PostProcessor.clean_text, fused into a single pattern so
+# the text is scanned once. Each alternative is dispatched by group name in
+# _replace_markup; groups ending in "_text" hold the content that is kept.
+_MARKUP_RE = re.compile(
+    r'(?P<link>\[(?P<link_text>[^\]]+)\]\([^)]+\))'   # Markdown links
+    r'|(?P<url>https?://\S+)'                         # URLs
+    r'|(?P<bold>\*\*(?P<bold_text>.*?)\*\*)'          # Bold
+    r'|(?P<italic>\*(?P<italic_text>.*?)\*)'          # Italic
+    r'|(?P<strike>~~(?P<strike_text>.*?)~~)'          # Strikethrough
+    r'|(?P<header>#+ )'                               # Headers
+)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _replace_markup(match: re.Match) -> str:
+    """Return the replacement for a single _MARKUP_RE match."""
+    kind = match.lastgroup
+    if kind in ('url', 'header'):
+        return ''
+    # Formatting can be nested (e.g. a bold link), so clean the kept text too
+    return _MARKUP_RE.sub(_replace_markup, match.group(kind + '_text'))
+
 class PostProcessor:
     """Process and format Reddit content for video generation."""
     
@@ -15,23 +38,14 @@ class PostProcessor:
         Returns:
             Cleaned text
         """
-        # Remove URLs
-        text = re.sub(r'https?://\S+', '', text)
-        
-        # Remove Reddit-specific formatting
-        text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)  # Remove markdown links
-        text = re.sub(r'&amp;', '&', text)  # Convert HTML entities
-        text = re.sub(r'&lt;', '<', text)
-        text = re.sub(r'&gt;', '>', text)
+        # Remove URLs, markdown links and formatting in a single pass
+        text = _MARKUP_RE.sub(_replace_markup, text)
         
-        # Remove markdown formatting
-        text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)  # Bold
-        text = re.sub(r'\*(.*?)\*', r'\1', text)      # Italic
-        text = re.sub(r'~~(.*?)~~', r'\1', text)      # Strikethrough
-        text = re.sub(r'#+ ', '', text)               # Headers
+        # Convert HTML entities
+        text = html.unescape(text)
         
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _WHITESPACE_RE.sub(' ', text).strip()
         
         return text
     
@@ -50,38 +64,59 @@ class PostProcessor:
         """
         segments = []
         
-        # Add post title
+        # Add post title (always kept, even if it alone exceeds max_length)
+        title_text = PostProcessor.clean_text(post['title'])
         segments.append({
             'type': 'title',
-            'text': PostProcessor.clean_text(post['title']),
+            'text': title_text,
             'author': post['author'],
             'subreddit': post['subreddit']
         })
         
+        # Track the script length so we stop at the first segment that doesn't
+        # fit, instead of cleaning content that would be discarded
+        current_length = len(title_text)
+        
         # Add post content if it exists and isn't too long
         if post.get('selftext') and len(post['selftext']) > 0:
             cleaned_content = PostProcessor.clean_text(post['selftext'])
             
             # Split long posts into paragraphs
             paragraphs = re.split(r'\n+', cleaned_content)
+            total_parts = len([p for p in paragraphs if p.strip()])
             for i, paragraph in enumerate(paragraphs):
-                if paragraph.strip():  # Skip empty paragraphs
-                    segments.append({
-                        'type': 'post_content',
-                        'text': paragraph.strip(),
-                        'author': post['author'],
-                        'part': i + 1,
-                        'total_parts': len([p for p in paragraphs if p.strip()])
-                    })
+                paragraph = paragraph.strip()
+                if not paragraph:  # Skip empty paragraphs
+                    continue
+                
+                if current_length + len(paragraph) > max_length:
+                    return segments
+                
+                segments.append({
+                    'type': 'post_content',
+                    'text': paragraph,
+                    'author': post['author'],
+                    'part': i + 1,
+                    'total_parts': total_parts
+                })
+                current_length += len(paragraph)
         
         # Add comments
         for i, comment in enumerate(comments):
+            # Cleaning never lengthens text, so very short comments can be
+            # skipped without cleaning them
+            if len(comment['body']) < 5:
+                continue
+            
             cleaned_comment = PostProcessor.clean_text(comment['body'])
             
             # Skip very short or empty comments
             if len(cleaned_comment) < 5:
                 continue
-                
+            
+            if current_length + len(cleaned_comment) > max_length:
+                break
+            
             segments.append({
                 'type': 'comment',
                 'text': cleaned_comment,
@@ -89,22 +124,6 @@ class PostProcessor:
                 'score': comment['score'],
                 'comment_number': i + 1
             })
-            
-        # Ensure the total script doesn't exceed max_length
-        total_length = sum(len(segment['text']) for segment in segments)
-        if total_length > max_length:
-            # Keep title and truncate the rest
-            result = [segments[0]]
-            current_length = len(segments[0]['text'])
-            
-            for segment in segments[1:]:
-                segment_length = len(segment['text'])
-                if current_length + segment_length <= max_length:
-                    result.append(segment)
-                    current_length += segment_length
-                else:
-                    break
-                    
-            return result
+            current_length += len(cleaned_comment)
         
-        return segments
\ No newline at end of file
+        return segments
@@ -1,31 +1,242 @@
 """
 Updated reddit_client.py to ensure consistent return types
 """
+import os
+import json
+import time
+import hashlib
+import itertools
+import random
+import tempfile
+import threading
 import praw
 import logging
+import requests
+from requests.adapters import HTTPAdapter
 import config
-from typing import List, Dict, Any, Union
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from prawcore.exceptions import RequestException, ServerError, TooManyRequests
+from typing import List, Dict, Any, Iterator, Optional, Union
+
+# Errors worth retrying: rate limiting, Reddit server errors and network failures
+TRANSIENT_ERRORS = (TooManyRequests, ServerError, RequestException)
+
+class RateLimitedSession(requests.Session):
+    """requests.Session that calls a gate function before sending every request."""
+    
+    def __init__(self, gate):
+        super().__init__()
+        self._gate = gate
+    
+    def request(self, *args, **kwargs):
+        self._gate()
+        return super().request(*args, **kwargs)
 
 class RedditClient:
-    def __init__(self, client_id=None, client_secret=None, user_agent=None):
+    def __init__(self, client_id=None, client_secret=None, user_agent=None, use_cache=True):
         """Initialize the Reddit client."""
         self.logger = logging.getLogger(__name__)
         
+        # Serve repeated fetches from the on-disk response cache
+        self.use_cache = use_cache
+        
+        # PRAW instances aren't thread-safe, so each thread gets its own
+        # Reddit instance (and subreddit handles), all sharing one session
+        self._local = threading.local()
+        
+        # Long-lived fetch threads, created on first use. Reusing the same
+        # threads keeps their Reddit instances (and OAuth tokens) alive across
+        # calls instead of building new ones for every batch
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        
+        # Pooled HTTP session so API round-trips reuse open connections. Every
+        # request it sends (listing pages, comment fetches, token refreshes)
+        # passes through the rate limit gate first
+        self.session = RateLimitedSession(self._rate_gate)
+        self.session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=0))
+        
+        # Rate limit state reported by Reddit's X-Ratelimit-* response headers
+        self._ratelimit_lock = threading.Lock()
+        self._ratelimit_remaining = None
+        self._ratelimit_reset_at = 0.0
+        # Earliest time the next throttled request may go out
+        self._ratelimit_next_send = 0.0
+        self.session.hooks["response"].append(self._record_ratelimit)
+        
         # Create a Reddit instance - using read-only mode if no credentials provided
         try:
-            self.reddit = praw.Reddit(
-                client_id=config.REDDIT_CLIENT_ID,
-                client_secret=config.REDDIT_CLIENT_SECRET,
-                user_agent=config.REDDIT_USER_AGENT,
-                check_for_updates=False,  # Disable update check to avoid warnings
-            )
-            self.reddit.read_only = True
+            self.reddit = self._local.reddit = self._create_reddit()
             self.logger.info("Reddit client initialized")
         except Exception as e:
             self.logger.error(f"Failed to initialize Reddit client: {e}")
             raise
     
-    def get_top_posts(self, subreddit_name: str, limit: int = 10, time_filter: str = "day") -> List[Dict[str, Any]]:
+    def _create_reddit(self):
+        """Create a read-only Reddit instance that sends its requests through the pooled session."""
+        reddit = praw.Reddit(
+            client_id=config.REDDIT_CLIENT_ID,
+            client_secret=config.REDDIT_CLIENT_SECRET,
+            user_agent=config.REDDIT_USER_AGENT,
+            check_for_updates=False,  # Disable update check to avoid warnings
+            requestor_kwargs={"session": self.session},
+        )
+        reddit.read_only = True
+        return reddit
+    
+    def _get_reddit(self):
+        """Return the calling thread's Reddit instance, creating it on first use."""
+        reddit = getattr(self._local, "reddit", None)
+        if reddit is None:
+            reddit = self._local.reddit = self._create_reddit()
+        return reddit
+    
+    def _get_subreddit(self, subreddit_name: str):
+        """Return a cached Subreddit handle for the given name, bound to this thread's instance."""
+        subreddits = getattr(self._local, "subreddits", None)
+        if subreddits is None:
+            subreddits = self._local.subreddits = {}
+        
+        subreddit = subreddits.get(subreddit_name)
+        if subreddit is None:
+            subreddit = subreddits[subreddit_name] = self._get_reddit().subreddit(subreddit_name)
+        return subreddit
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Return the client's shared fetch pool, creating it on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=config.REDDIT_MAX_WORKERS,
+                                                    thread_name_prefix="reddit")
+            return self._executor
+    
+    def _record_ratelimit(self, response, *args, **kwargs):
+        """Session response hook that records the remaining rate limit budget."""
+        remaining = response.headers.get("x-ratelimit-remaining")
+        reset = response.headers.get("x-ratelimit-reset")
+        if remaining is None or reset is None:
+            return
+        
+        try:
+            remaining = float(remaining)
+            reset = float(reset)
+        except ValueError:
+            return
+        
+        with self._ratelimit_lock:
+            self._ratelimit_remaining = remaining
+            self._ratelimit_reset_at = time.monotonic() + reset
+    
+    def _rate_gate(self):
+        """
+        Wait before an HTTP request if the rate limit budget is running low.
+        
+        Requests go out immediately while plenty of the window's budget is
+        left; below config.REDDIT_RATELIMIT_THRESHOLD the remaining requests
+        are spread evenly over the time until the window resets.
+        
+        Each call takes its share of the budget and reserves its send slot
+        under the lock, so concurrent threads queue up one interval apart
+        instead of all waiting the same delay and firing together.
+        """
+        with self._ratelimit_lock:
+            now = time.monotonic()
+            remaining = self._ratelimit_remaining
+            seconds_to_reset = self._ratelimit_reset_at - now
+            if remaining is None or seconds_to_reset <= 0:
+                return
+            
+            # Count this request against the budget before the response arrives
+            self._ratelimit_remaining = remaining - 1
+            if remaining > config.REDDIT_RATELIMIT_THRESHOLD:
+                return
+            
+            send_at = max(now, self._ratelimit_next_send)
+            self._ratelimit_next_send = send_at + seconds_to_reset / max(remaining, 1)
+            delay = send_at - now
+        
+        if delay > 0:
+            self.logger.info(f"Reddit rate limit low ({remaining:.0f} left), waiting {delay:.1f}s")
+            time.sleep(delay)
+    
+    def _with_retries(self, fetch, description: str):
+        """
+        Call fetch(), retrying transient Reddit errors.
+        
+        Rate limiting (HTTP 429), server errors and network failures are
+        retried with exponential backoff and full jitter, honoring a
+        Retry-After header when Reddit sends one. Other errors, and the last
+        failed attempt, are raised to the caller.
+        """
+        for attempt in range(1, config.REDDIT_MAX_RETRIES + 1):
+            try:
+                return fetch()
+            except TRANSIENT_ERRORS as e:
+                if attempt == config.REDDIT_MAX_RETRIES:
+                    raise
+                
+                delay = self._retry_delay(e, attempt)
+                self.logger.warning(f"Transient error {description} (attempt {attempt}): {e}; "
+                                    f"retrying in {delay:.1f}s")
+                time.sleep(delay)
+    
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Return how long to wait before retrying after a transient error."""
+        response = getattr(error, "response", None)
+        if isinstance(error, TooManyRequests) and response is not None:
+            retry_after = response.headers.get("retry-after")
+            try:
+                return float(retry_after)
+            except (TypeError, ValueError):
+                pass
+        
+        # Full jitter: a random delay up to the exponential backoff ceiling
+        ceiling = min(config.REDDIT_RETRY_MAX_DELAY, config.REDDIT_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+    
+    def _cache_path(self, key) -> str:
+        """Return the cache file path for a cache key."""
+        digest = hashlib.sha1(json.dumps(key).encode("utf-8")).hexdigest()
+        return os.path.join(config.REDDIT_CACHE_DIR, f"{digest}.json")
+    
+    def _cache_get(self, key, ttl: float):
+        """Return the cached value for key, or None if missing or older than ttl seconds."""
+        if not self.use_cache:
+            return None
+        
+        path = self._cache_path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > ttl:
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _cache_set(self, key, value):
+        """Store a JSON-serializable value in the cache under key."""
+        if not self.use_cache:
+            return
+        
+        path = self._cache_path(key)
+        temp_path = None
+        try:
+            os.makedirs(config.REDDIT_CACHE_DIR, exist_ok=True)
+            # Write to a unique temporary file first so readers never see a partial entry
+            fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=config.REDDIT_CACHE_DIR)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(temp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.warning(f"Failed to write Reddit cache entry {path}: {e}")
+            if temp_path and os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+    
+    def get_top_posts(self, subreddit_name: str, limit: int = 10, time_filter: str = "day",
+                      self_only: bool = False) -> List[Dict[str, Any]]:
         """
         Get top posts from a subreddit.
         
@@ -33,82 +244,218 @@ class RedditClient:
             subreddit_name: Name of the subreddit (without "r/")
             limit: Maximum number of posts to retrieve
             time_filter: One of "hour", "day", "week", "month", "year", "all"
+            self_only: Only return text (self) posts
             
         Returns:
             List of post objects
         """
+        cache_key = ["top", subreddit_name, time_filter, limit, self_only]
+        cached = self._cache_get(cache_key, config.REDDIT_CACHE_TTL.get(time_filter, 300))
+        if cached is not None:
+            self.logger.info(f"Loaded {len(cached)} cached posts from r/{subreddit_name}")
+            return cached
+        
         try:
-            subreddit = self.reddit.subreddit(subreddit_name)
-            posts = []
-            
-            for post in subreddit.top(time_filter=time_filter, limit=limit):
-                # Convert PRAW post object to dictionary
-                post_dict = {
-                    "id": post.id,
-                    "title": post.title,
-                    "selftext": post.selftext,
-                    "score": post.score,
-                    "url": post.url,
-                    "num_comments": post.num_comments,
-                    "created_utc": post.created_utc,
-                    "author": str(post.author) if post.author else "[deleted]",
-                    "permalink": post.permalink,
-                    "is_self": post.is_self,
-                    "over_18": post.over_18,
-                    "raw_post": post  # Keep the raw post object for getting comments later
-                }
-                posts.append(post_dict)
+            posts = self._with_retries(
+                lambda: self._fetch_top_posts(subreddit_name, limit, time_filter, self_only),
+                f"fetching posts from r/{subreddit_name}"
+            )
             
             self.logger.info(f"Fetched {len(posts)} posts from r/{subreddit_name}")
+            if posts:
+                self._cache_set(cache_key, posts)
             return posts
             
         except Exception as e:
             self.logger.error(f"Error fetching posts from r/{subreddit_name}: {e}")
             return []
     
-    def get_top_comments(self, post: Dict[str, Any], limit: int = 10) -> List[Dict[str, Any]]:
+    def get_top_posts_multi(self, subreddit_names: List[str], limit: int = 10, time_filter: str = "day",
+                            self_only: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get top posts across several subreddits with a single listing request.
+        
+        Reddit serves a combined "r/a+b+c" listing, so this costs one API
+        request instead of one per subreddit. Each post's 'subreddit' field
+        records where it came from.
+        
+        Args:
+            subreddit_names: Names of the subreddits (without "r/")
+            limit: Maximum number of posts to retrieve in total
+            time_filter: One of "hour", "day", "week", "month", "year", "all"
+            self_only: Only return text (self) posts
+            
+        Returns:
+            List of post objects
+        """
+        return self.get_top_posts("+".join(subreddit_names), limit=limit,
+                                  time_filter=time_filter, self_only=self_only)
+    
+    def _fetch_top_posts(self, subreddit_name: str, limit: int, time_filter: str,
+                         self_only: bool) -> List[Dict[str, Any]]:
+        """Request top posts from Reddit and convert them to dictionaries."""
+        # Over-fetch when filtering so link posts don't leave us short of limit
+        fetch_limit = limit * 3 if self_only else limit
+        posts = self.iter_top_posts(subreddit_name, time_filter=time_filter,
+                                    limit=fetch_limit, self_only=self_only)
+        return list(itertools.islice(posts, limit))
+    
+    def iter_top_posts(self, subreddit_name: str, time_filter: str = "day", limit: Optional[int] = None,
+                       self_only: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield top posts from a subreddit.
+        
+        Listing pages are only requested as the iterator is consumed, so
+        callers that stop early (e.g. with itertools.islice) don't pay for
+        posts they never use. Unlike get_top_posts, results are not cached
+        or retried.
+        
+        Args:
+            subreddit_name: Name of the subreddit (without "r/")
+            time_filter: One of "hour", "day", "week", "month", "year", "all"
+            limit: Maximum number of posts to request from Reddit (None for no limit)
+            self_only: Skip link posts and only yield text (self) posts
+            
+        Yields:
+            Post dictionaries
+        """
+        subreddit = self._get_subreddit(subreddit_name)
+        
+        for post in subreddit.top(time_filter=time_filter, limit=limit):
+            if self_only and not post.is_self:
+                continue
+            
+            yield self._post_to_dict(post)
+    
+    @staticmethod
+    def _post_to_dict(post) -> Dict[str, Any]:
+        """
+        Convert a PRAW submission to a post dictionary.
+        
+        Only the fields used downstream are read, all of which are populated
+        by listing responses, so no extra lazy fetch is triggered.
+        """
+        author = post.author
+        return {
+            "id": post.id,
+            "title": post.title,
+            "selftext": post.selftext,
+            "score": post.score,
+            "created_utc": post.created_utc,
+            "author": str(author) if author else "[deleted]",
+            "subreddit": post.subreddit.display_name,
+        }
+    
+    def get_top_comments(self, post: Union[Dict[str, Any], str], limit: int = 10) -> List[Dict[str, Any]]:
         """
         Get top comments from a post.
         
         Args:
-            post: Post dictionary with 'raw_post' key containing the PRAW post object
+            post: Post dictionary with an 'id' key, or the post ID itself
             limit: Maximum number of comments to retrieve
             
         Returns:
             List of comment dictionaries
         """
+        post_id = post["id"] if isinstance(post, dict) else post
+        
+        cache_key = ["comments", post_id, limit]
+        cached = self._cache_get(cache_key, config.REDDIT_COMMENTS_CACHE_TTL)
+        if cached is not None:
+            self.logger.info(f"Loaded {len(cached)} cached comments for post {post_id}")
+            return cached
+        
         try:
-            # Get the raw post object
-            raw_post = post.get("raw_post")
-            if not raw_post:
-                self.logger.error("No raw_post found in post dictionary")
-                return []
-            
-            # Extract comments
-            raw_post.comment_sort = "top"
-            raw_post.comments.replace_more(limit=0)  # Skip "load more comments" links
-            
-            comments = []
-            for comment in raw_post.comments[:limit]:
-                if not comment.author:
-                    continue  # Skip deleted comments
-                
-                comment_dict = {
-                    "id": comment.id,
-                    "body": comment.body,
-                    "score": comment.score,
-                    "author": str(comment.author) if comment.author else "[deleted]",
-                    "created_utc": comment.created_utc,
-                }
-                comments.append(comment_dict)
-            
-            self.logger.info(f"Fetched {len(comments)} comments for post {post['id']}")
+            comments = self._with_retries(
+                lambda: self._fetch_top_comments(post_id, limit),
+                f"fetching comments for post {post_id}"
+            )
+            
+            self.logger.info(f"Fetched {len(comments)} comments for post {post_id}")
+            if comments:
+                self._cache_set(cache_key, comments)
             return comments
             
         except Exception as e:
-            self.logger.error(f"Error fetching comments for post {post.get('id', 'unknown')}: {e}")
+            self.logger.error(f"Error fetching comments for post {post_id}: {e}")
             return []
     
+    def _fetch_top_comments(self, post_id: str, limit: int) -> List[Dict[str, Any]]:
+        """Request a post's top-level comments from Reddit and convert them to dictionaries."""
+        # Look up the submission lazily; only the comments are fetched
+        submission = self._get_reddit().submission(id=post_id)
+        
+        # Extract comments
+        submission.comment_sort = "top"
+        submission.comments.replace_more(limit=0)  # Skip "load more comments" links
+        
+        comments = []
+        for comment in submission.comments:
+            if len(comments) >= limit:
+                break
+            
+            author = comment.author
+            if not author:
+                continue  # Skip deleted comments
+            
+            comment_dict = {
+                "id": comment.id,
+                "body": comment.body,
+                "score": comment.score,
+                "author": str(author),
+                "created_utc": comment.created_utc,
+            }
+            comments.append(comment_dict)
+        
+        return comments
+    
+    def get_top_comments_async(self, post: Union[Dict[str, Any], str], limit: int = 10) -> Future:
+        """
+        Start fetching top comments from a post on the client's fetch pool.
+        
+        Args:
+            post: Post dictionary with an 'id' key, or the post ID itself
+            limit: Maximum number of comments to retrieve
+            
+        Returns:
+            Future resolving to the list of comment dictionaries
+        """
+        return self._get_executor().submit(self.get_top_comments, post, limit)
+    
+    def get_top_comments_batch(self, posts: List[Union[Dict[str, Any], str]], limit: int = 10,
+                               max_workers: int = 6) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get top comments for several posts concurrently.
+        
+        Args:
+            posts: Post dictionaries with an 'id' key, or post IDs
+            limit: Maximum number of comments to retrieve per post
+            max_workers: Maximum number of concurrent requests (further capped by
+                config.REDDIT_MAX_WORKERS, the size of the shared fetch pool)
+            
+        Returns:
+            Dictionary mapping post IDs to their comment lists
+        """
+        post_ids = [post["id"] if isinstance(post, dict) else post for post in posts]
+        if not post_ids:
+            return {}
+        
+        # Each pool thread uses its own Reddit instance (PRAW isn't thread-safe);
+        # all of them share the pooled session, so workers reuse open connections.
+        # At most max_workers fetches are in flight; each finished one starts the next
+        executor = self._get_executor()
+        remaining = iter(post_ids)
+        pending = {executor.submit(self.get_top_comments, post_id, limit): post_id
+                   for post_id in itertools.islice(remaining, max(1, max_workers))}
+        comments = {}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                comments[pending.pop(future)] = future.result()
+                for post_id in itertools.islice(remaining, 1):
+                    pending[executor.submit(self.get_top_comments, post_id, limit)] = post_id
+        return comments
+    
     def get_post_and_comments(self, subreddit_name: str, post_id: str = None, num_comments: int = 10) -> Dict[str, Any]:
         """
         Get a post and its comments.
@@ -124,21 +471,7 @@ class RedditClient:
         try:
             # If post_id is provided, get that specific post
             if post_id:
-                post = self.reddit.submission(id=post_id)
-                post_dict = {
-                    "id": post.id,
-                    "title": post.title,
-                    "selftext": post.selftext,
-                    "score": post.score,
-                    "url": post.url,
-                    "num_comments": post.num_comments,
-                    "created_utc": post.created_utc,
-                    "author": str(post.author) if post.author else "[deleted]",
-                    "permalink": post.permalink,
-                    "is_self": post.is_self,
-                    "over_18": post.over_18,
-                    "raw_post": post
-                }
+                post_dict = self._post_to_dict(self._get_reddit().submission(id=post_id))
             else:
                 # Otherwise, get the top post from the subreddit
                 posts = self.get_top_posts(subreddit_name, limit=1)
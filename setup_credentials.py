@@ -44,6 +44,7 @@ REDDIT_USER_AGENT={user_agent}
 # VIDEO_FPS=30
 # VIDEO_DURATION=60
 # TTS_RATE=175
+# PIPER_MODEL_PATH=/path/to/piper/voice.onnx
 """
     
     try:
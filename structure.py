@@ -4,6 +4,8 @@ Check the structure of the Reddit Story Generator project and validate required
 import os
 import sys
 
+from file_types import BACKGROUND_EXTENSIONS, FONT_EXTENSIONS, list_files
+
 def check_structure():
     """Check the structure of the Reddit Story Generator project."""
     project_dir = os.path.dirname(os.path.abspath(__file__))
@@ -53,21 +55,19 @@ def check_structure():
     # Check backgrounds directory for content
     backgrounds_dir = os.path.join(project_dir, "assets/backgrounds")
     if os.path.isdir(backgrounds_dir):
-        background_files = [f for f in os.listdir(backgrounds_dir) 
-                           if f.endswith(('.mp4', '.mov', '.avi', '.png', '.jpg', '.jpeg'))]
+        background_files = list_files(backgrounds_dir, BACKGROUND_EXTENSIONS)
         
         print(f"\nFound {len(background_files)} background files:")
         for bg_file in background_files:
             print(f"  - {bg_file}")
         
         if not background_files:
-            print("  [WARNING] No background files found! Please add mp4, mov, avi, png, jpg, or jpeg files.")
+            print("  [WARNING] No background files found! Please add mp4, mov, avi, mkv, png, jpg, or jpeg files.")
     
     # Check fonts directory for content
     fonts_dir = os.path.join(project_dir, "assets/fonts")
     if os.path.isdir(fonts_dir):
-        font_files = [f for f in os.listdir(fonts_dir) 
-                     if f.endswith(('.ttf', '.otf'))]
+        font_files = list_files(fonts_dir, FONT_EXTENSIONS)
         
         print(f"\nFound {len(font_files)} font files:")
         for font_file in font_files:
@@ -1,24 +1,57 @@
 import os
+import wave
+import shutil
+import hashlib
 import pyttsx3
 import logging
 import tempfile
-from typing import Dict, Optional
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
 
 import config
+import worker_logging
+
+try:
+    from piper import PiperVoice  # Optional neural TTS backend (piper-tts)
+except ImportError:
+    PiperVoice = None
 
 logger = logging.getLogger(__name__)
 
 class TTSEngine:
-    """Text-to-speech engine using pyttsx3."""
+    """Text-to-speech engine using a Piper neural voice if configured, otherwise pyttsx3."""
     
-    def __init__(self, voice_id: Optional[str] = None, rate: int = config.TTS_RATE):
+    def __init__(self, voice_id: Optional[str] = None, rate: int = config.TTS_RATE,
+                 model_path: Optional[str] = config.PIPER_MODEL_PATH, use_cache: bool = True):
         """
         Initialize the TTS engine.
         
         Args:
-            voice_id: ID of the voice to use (None for default)
-            rate: Speech rate in words per minute
+            voice_id: ID of the voice to use (None for default, pyttsx3 only)
+            rate: Speech rate in words per minute (pyttsx3 only)
+            model_path: Path to a Piper .onnx voice model (None to use pyttsx3)
+            use_cache: Reuse previously synthesized audio for identical text
         """
+        self.voice_id = voice_id
+        self.rate = rate
+        self.model_path = model_path
+        self.use_cache = use_cache
+        self.voice = None
+        self.engine = None
+        
+        # Load the Piper voice once; it is shared by all conversions
+        if model_path:
+            if PiperVoice is None:
+                logger.warning("PIPER_MODEL_PATH is set but piper-tts is not installed, using pyttsx3")
+            else:
+                try:
+                    self.voice = PiperVoice.load(model_path)
+                    logger.info(f"TTS engine initialized with Piper voice {model_path}")
+                    return
+                except Exception as e:
+                    logger.error(f"Failed to load Piper voice {model_path}, using pyttsx3: {e}")
+        
         self.engine = pyttsx3.init()
         self.engine.setProperty('rate', rate)
         
@@ -36,6 +69,9 @@ class TTSEngine:
             Dictionary mapping voice IDs to voice names
         """
         voices = {}
+        if self.engine is None:
+            return voices  # A Piper model provides a single voice
+        
         for voice in self.engine.getProperty('voices'):
             voices[voice.id] = voice.name
         return voices
@@ -55,24 +91,163 @@ class TTSEngine:
             logger.warning("Empty text provided to TTS engine")
             return ""
             
+        created_temp = False
         try:
             # Create a temporary file if no output path is specified
             if output_path is None:
-                fd, output_path = tempfile.mkstemp(suffix='.mp3')
+                fd, output_path = tempfile.mkstemp(suffix='.wav' if self.voice else '.mp3')
                 os.close(fd)
+                created_temp = True
                 
             logger.info(f"Converting text to speech: {text[:50]}...")
             
+            # Reuse cached audio for text synthesized before with the same voice
+            cache_path = self._cache_path(text, os.path.splitext(output_path)[1])
+            if cache_path and os.path.isfile(cache_path):
+                shutil.copyfile(cache_path, output_path)
+                _touch(cache_path)
+                logger.info(f"Audio for cached text copied to {output_path}")
+                return output_path
+            
             # Save audio to file
-            self.engine.save_to_file(text, output_path)
-            self.engine.runAndWait()
+            if self.voice:
+                self._synthesize_piper(text, output_path)
+            else:
+                self.engine.save_to_file(text, output_path)
+                self.engine.runAndWait()
+            
+            if cache_path:
+                self._store_in_cache(output_path, cache_path)
             
             logger.info(f"Audio saved to {output_path}")
             return output_path
         except Exception as e:
             logger.error(f"Error in text-to-speech conversion: {e}")
+            if created_temp:
+                _remove_quietly(output_path)
             return ""
     
+    def _cache_path(self, text: str, suffix: str) -> Optional[str]:
+        """
+        Return the cache file for text spoken with this engine's voice settings.
+        
+        Synthesis is deterministic for a given voice, rate and text, so the
+        cache is keyed on a hash of all three. Returns None if caching is off.
+        """
+        if not self.use_cache:
+            return None
+        
+        voice = f"piper:{self.model_path}" if self.voice else f"pyttsx3:{self.voice_id}"
+        key = hashlib.sha256(f"{voice}|{self.rate}|{text}".encode('utf-8')).hexdigest()
+        return os.path.join(config.TTS_CACHE_DIR, key + suffix)
+    
+    def _store_in_cache(self, audio_path: str, cache_path: str):
+        """Copy newly synthesized audio into the cache."""
+        try:
+            # Engines can fail silently and leave an empty file; don't cache those
+            if os.path.getsize(audio_path) == 0:
+                return
+            
+            os.makedirs(config.TTS_CACHE_DIR, exist_ok=True)
+            # Copy to a unique temporary name first so readers never see a partial file
+            fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=config.TTS_CACHE_DIR)
+            os.close(fd)
+        except OSError as e:
+            logger.warning(f"Failed to cache audio {audio_path}: {e}")
+            return
+        
+        try:
+            shutil.copyfile(audio_path, temp_path)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to cache audio {audio_path}: {e}")
+            _remove_quietly(temp_path)
+            return
+        
+        _prune_cache(config.TTS_CACHE_DIR, config.TTS_CACHE_MAX_BYTES)
+    
+    def _synthesize_piper(self, text: str, output_path: str):
+        """Synthesize text to a WAV file with the Piper voice."""
+        with wave.open(output_path, 'wb') as wav_file:
+            if hasattr(self.voice, 'synthesize_wav'):
+                self.voice.synthesize_wav(text, wav_file)  # piper-tts >= 1.3
+            else:
+                self.voice.synthesize(text, wav_file)
+    
+    def text_to_speech_batch(self, texts: List[str], max_workers: int = config.TTS_MAX_WORKERS) -> List[str]:
+        """
+        Convert several texts to speech concurrently.
+        
+        Piper inference releases the GIL, so a Piper voice is shared by a
+        thread pool. pyttsx3 engines are not thread-safe, so with pyttsx3 each
+        text is synthesized in a worker process that owns its own engine.
+        Cached texts are copied in this process, and no workers are started
+        when every text is cached.
+        
+        Args:
+            texts: Texts to convert to speech
+            max_workers: Maximum number of worker threads or processes
+            
+        Returns:
+            Paths to the generated audio files, in the same order as texts
+            (empty strings for failed conversions)
+        """
+        # Serve cached texts here, so workers are only started for texts that
+        # actually need synthesizing
+        paths = [self._load_cached(text) for text in texts]
+        misses = [i for i, path in enumerate(paths) if path is None]
+        miss_texts = [texts[i] for i in misses]
+        
+        for i, path in zip(misses, self._synthesize_batch(miss_texts, max_workers)):
+            paths[i] = path
+        
+        return paths
+    
+    def _load_cached(self, text: str) -> Optional[str]:
+        """Copy cached audio for text to a new temporary file, or return None on a cache miss."""
+        suffix = '.wav' if self.voice else '.mp3'
+        cache_path = self._cache_path(text, suffix) if text else None
+        if not cache_path or not os.path.isfile(cache_path):
+            return None
+        
+        output_path = None
+        try:
+            fd, output_path = tempfile.mkstemp(suffix=suffix)
+            os.close(fd)
+            shutil.copyfile(cache_path, output_path)
+            _touch(cache_path)
+            return output_path
+        except OSError as e:
+            logger.warning(f"Failed to read cached audio {cache_path}: {e}")
+            if output_path:
+                _remove_quietly(output_path)
+            return None
+    
+    def _synthesize_batch(self, texts: List[str], max_workers: int) -> List[str]:
+        """Synthesize texts concurrently (see text_to_speech_batch)."""
+        if len(texts) <= 1:
+            return [self.text_to_speech(text) for text in texts]
+        
+        workers = min(max_workers, os.cpu_count() or 1, len(texts))
+        
+        if self.voice:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(self.text_to_speech, texts))
+        
+        try:
+            # Spawn fresh workers rather than forking, so they don't inherit this
+            # process's pyttsx3 engine
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_worker,
+                                     initargs=(self.voice_id, self.rate, self.use_cache,
+                                               worker_logging.get_log_queue(),
+                                               logging.getLogger().level)) as executor:
+                return list(executor.map(_worker_text_to_speech, texts))
+        except Exception as e:
+            logger.error(f"Error in parallel text-to-speech conversion, falling back to sequential: {e}")
+            return [self.text_to_speech(text) for text in texts]
+    
     def estimate_duration(self, text: str) -> float:
         """
         Estimate the duration of the speech in seconds.
@@ -92,4 +267,52 @@ class TTSEngine:
         # Add some buffer time
         duration *= 1.1
         
-        return duration
\ No newline at end of file
+        return duration
+
+def _touch(path: str):
+    """Mark a cache entry as recently used so eviction keeps it."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+def _remove_quietly(path: str):
+    """Delete a file, ignoring errors (e.g. it is already gone)."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _prune_cache(cache_dir: str, max_bytes: int):
+    """
+    Evict the least recently used audio until the cache fits in max_bytes.
+    
+    Entries are ordered by modification time, which cache hits refresh.
+    """
+    try:
+        stats = [(entry.path, entry.stat()) for entry in os.scandir(cache_dir)
+                 if entry.is_file() and not entry.name.endswith('.tmp')]
+    except OSError as e:
+        logger.warning(f"Failed to scan TTS cache {cache_dir}: {e}")
+        return
+    
+    total = sum(st.st_size for _, st in stats)
+    for path, st in sorted(stats, key=lambda item: item[1].st_mtime):
+        if total <= max_bytes:
+            break
+        _remove_quietly(path)
+        total -= st.st_size
+
+# TTS engine owned by a text_to_speech_batch worker process
+_worker_engine = None
+
+def _init_worker(voice_id: Optional[str], rate: int, use_cache: bool, log_queue=None,
+                 log_level: int = logging.INFO):
+    """Create the TTS engine for a batch worker process."""
+    global _worker_engine
+    worker_logging.install_queue_handler(log_queue, log_level)
+    _worker_engine = TTSEngine(voice_id=voice_id, rate=rate, model_path=None, use_cache=use_cache)
+
+def _worker_text_to_speech(text: str) -> str:
+    """Convert text to speech using the worker process's engine."""
+    return _worker_engine.text_to_speech(text)
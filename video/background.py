@@ -3,26 +3,47 @@ Updated background.py with fixes for Pillow compatibility
 """
 import os
 import random
+import hashlib
 import logging
+import subprocess
+import numpy as np
 from PIL import Image, ImageFilter
+from moviepy.config import get_setting
+from moviepy.editor import VideoFileClip
+
+import config
+from config import IMAGE_EXTENSIONS, BACKGROUND_EXTENSIONS
+
+try:
+    import cv2  # Optional: SIMD-accelerated resizing and filtering
+except ImportError:
+    cv2 = None
+
+# PIL image modes that map directly onto an OpenCV array
+CV2_IMAGE_MODES = ('L', 'RGB', 'RGBA')
 
 class BackgroundManager:
     def __init__(self, backgrounds_dir):
         """Initialize the background manager with a directory of background videos/images."""
         self.backgrounds_dir = backgrounds_dir
         self.logger = logging.getLogger(__name__)
+        
+        # Cached directory listing, refreshed when the directory's mtime changes
+        self._background_files = ()
+        self._backgrounds_mtime = None
+        
+        # Open background video clips, keyed by path, shared across segments
+        self._clip_cache = {}
         self.logger.info(f"Background manager initialized with directory {backgrounds_dir}")
     
     def get_random_background(self):
         """Return a random background video or image from the backgrounds directory."""
-        if not os.path.exists(self.backgrounds_dir):
+        # Get all files in the backgrounds directory
+        background_files = self._get_background_files()
+        if background_files is None:
             self.logger.warning(f"Backgrounds directory not found: {self.backgrounds_dir}")
             return None
         
-        # Get all files in the backgrounds directory
-        background_files = [f for f in os.listdir(self.backgrounds_dir) 
-                           if f.endswith(('.mp4', '.mov', '.avi', '.png', '.jpg', '.jpeg'))]
-        
         if not background_files:
             self.logger.warning(f"No background files found in {self.backgrounds_dir}")
             return None
@@ -35,6 +56,117 @@ class BackgroundManager:
         
         return selected_bg
     
+    def _get_background_files(self):
+        """
+        Return the background file names, or None if the directory doesn't exist.
+        
+        The listing is cached and only rescanned when the directory's mtime
+        changes (i.e. files were added, removed or renamed).
+        """
+        try:
+            mtime = os.stat(self.backgrounds_dir).st_mtime
+        except FileNotFoundError:
+            return None
+        
+        if mtime != self._backgrounds_mtime:
+            self._background_files = tuple(config.list_files(self.backgrounds_dir, BACKGROUND_EXTENSIONS))
+            self._backgrounds_mtime = mtime
+        
+        return self._background_files
+    
+    def normalize(self, path, width, height):
+        """
+        Return a copy of a background scaled and center-cropped to width x height.
+        
+        The copy is made once and cached on disk, keyed by the source path,
+        its modification time and the target size, so clips built from it need
+        no per-frame resizing. Returns the original path if normalization fails.
+        
+        Args:
+            path: Path to the background video or image
+            width: Target width in pixels
+            height: Target height in pixels
+            
+        Returns:
+            Path to the normalized background
+        """
+        temp_path = None
+        try:
+            mtime = os.stat(path).st_mtime
+            key = hashlib.sha1(f"{path}|{mtime}|{width}x{height}".encode('utf-8')).hexdigest()
+            is_image = os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS
+            output_path = os.path.join(config.BACKGROUND_CACHE_DIR, key + ('.png' if is_image else '.mp4'))
+            
+            if os.path.exists(output_path):
+                return output_path
+            
+            self.logger.info(f"Normalizing background {path} to {width}x{height}")
+            os.makedirs(config.BACKGROUND_CACHE_DIR, exist_ok=True)
+            # Write under a temporary name so an interrupted run never leaves a partial file
+            root, ext = os.path.splitext(output_path)
+            temp_path = f"{root}.{os.getpid()}.tmp{ext}"
+            
+            if is_image:
+                with Image.open(path) as image:
+                    resized = self.resize_background(image.convert('RGB'), width, height)
+                if resized is None:
+                    return path
+                resized.save(temp_path)
+            else:
+                # -hwaccel auto decodes on the GPU (NVDEC, QSV, VAAPI, ...) when one
+                # is available and silently falls back to the CPU otherwise
+                subprocess.run(
+                    [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+                     "-hwaccel", "auto", "-i", path,
+                     "-vf", f"scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height}",
+                     "-an", "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", temp_path],
+                    check=True, capture_output=True)
+            
+            os.replace(temp_path, output_path)
+            return output_path
+        
+        except (OSError, subprocess.CalledProcessError) as e:
+            self.logger.error(f"Error normalizing background {path}: {e}")
+            # Don't leave a half-written copy behind in the cache directory
+            if temp_path and os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            return path
+    
+    def get_or_open(self, path, target_height=None):
+        """
+        Return an open VideoFileClip for the given background video.
+        
+        Each path is opened once and reused, so the ffmpeg reader isn't
+        restarted for every segment. Call close_clips() when done.
+        
+        Args:
+            path: Path to the background video
+            target_height: If given, ffmpeg scales frames to this height
+                (keeping the aspect ratio) while decoding
+            
+        Returns:
+            The open VideoFileClip
+        """
+        key = (path, target_height)
+        clip = self._clip_cache.get(key)
+        if clip is None:
+            # Scaling in ffmpeg's decoder is much cheaper than moviepy's
+            # per-frame resize; fast_bilinear is plenty for a background
+            target_resolution = (target_height, None) if target_height else None
+            clip = VideoFileClip(path, audio=False, target_resolution=target_resolution,
+                                 resize_algorithm="fast_bilinear")
+            self._clip_cache[key] = clip
+        return clip
+    
+    def close_clips(self):
+        """Close all background video clips opened by get_or_open()."""
+        for clip in self._clip_cache.values():
+            clip.close()
+        self._clip_cache.clear()
+    
     def resize_background(self, image, target_width, target_height):
         """Resize a background image to the target dimensions while maintaining aspect ratio."""
         try:
@@ -42,20 +174,30 @@ class BackgroundManager:
             img_aspect = image.width / image.height
             target_aspect = target_width / target_height
             
+            # Crop box (left, top, right, bottom) matching the target aspect ratio
+            box = (0, 0, image.width, image.height)
             if img_aspect > target_aspect:
                 # Image is wider than target, crop width
                 new_width = int(target_aspect * image.height)
                 left = (image.width - new_width) // 2
-                image = image.crop((left, 0, left + new_width, image.height))
+                box = (left, 0, left + new_width, image.height)
             elif img_aspect < target_aspect:
                 # Image is taller than target, crop height
                 new_height = int(image.width / target_aspect)
                 top = (image.height - new_height) // 2
-                image = image.crop((0, top, image.width, top + new_height))
+                box = (0, top, image.width, top + new_height)
+            
+            if cv2 is not None and image.mode in CV2_IMAGE_MODES:
+                # Crop by slicing an array view (no copy), then resize with OpenCV
+                left, top, right, bottom = box
+                pixels = np.asarray(image)[top:bottom, left:right]
+                resized = cv2.resize(pixels, (target_width, target_height),
+                                     interpolation=cv2.INTER_LANCZOS4)
+                return Image.fromarray(resized)
             
             # Resize to target dimensions
             # Updated to use LANCZOS instead of ANTIALIAS
-            return image.resize((target_width, target_height), Image.LANCZOS)
+            return image.crop(box).resize((target_width, target_height), Image.LANCZOS)
         
         except Exception as e:
             self.logger.error(f"Error resizing background image: {e}")
@@ -64,6 +206,12 @@ class BackgroundManager:
     def apply_blur(self, image, blur_radius=5):
         """Apply a blur effect to the background image."""
         try:
+            if cv2 is not None and image.mode in CV2_IMAGE_MODES:
+                # Separable, SIMD-accelerated Gaussian; PIL's radius is the standard deviation
+                blurred = cv2.GaussianBlur(np.asarray(image), (0, 0), sigmaX=blur_radius,
+                                           borderType=cv2.BORDER_REPLICATE)
+                return Image.fromarray(blurred)
+            
             return image.filter(ImageFilter.GaussianBlur(blur_radius))
         except Exception as e:
             self.logger.error(f"Error applying blur to background image: {e}")
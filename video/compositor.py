@@ -2,22 +2,100 @@
 Updated compositor.py to properly initialize the BackgroundManager with a backgrounds_dir parameter
 """
 import os
+import wave
+import shutil
 import logging
 import tempfile
 import uuid
-from typing import List, Dict, Optional, Any
-from moviepy.editor import VideoFileClip, ImageClip, AudioFileClip, CompositeVideoClip, concatenate_videoclips
+import functools
+import itertools
+import subprocess
+import multiprocessing
+import multiprocessing.util
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Optional, Any, Iterable, Iterator
+import numpy as np
+from moviepy.config import get_setting
+from moviepy.editor import VideoClip, ImageClip, AudioFileClip
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
 
+from config import VIDEO_EXTENSIONS, IMAGE_EXTENSIONS
+import worker_logging
 from .background import BackgroundManager
 from .text_overlay import TextOverlayGenerator
 
+# Default asset directories
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+BACKGROUNDS_DIR = os.path.join(ASSETS_DIR, "backgrounds")
+
+# H.264 encoders in order of preference: GPU/fixed-function encoders first
+HARDWARE_CODECS = ("h264_nvenc", "h264_qsv", "h264_videotoolbox", "h264_amf")
+SOFTWARE_CODEC = "libx264"
+
+# libx264 settings: videos are rendered once and re-encoded by the platforms
+# they're uploaded to, so encode speed matters more than bitrate efficiency
+SOFTWARE_CODEC_PRESET = "ultrafast"
+SOFTWARE_CODEC_PARAMS = ["-tune", "fastdecode"]
+
+# Rate control per hardware encoder: constant-quality VBR around libx264's
+# default CRF 23, capped at 6 Mbit/s for 1080x1920 output
+HARDWARE_CODEC_PARAMS = {
+    "h264_nvenc": ["-preset", "p4", "-rc", "vbr", "-cq", "23", "-b:v", "6M", "-maxrate", "6M"],
+    "h264_qsv": ["-preset", "faster", "-global_quality", "23"],
+    "h264_videotoolbox": ["-b:v", "6M"],
+    "h264_amf": ["-quality", "speed", "-rc", "vbr_peak", "-b:v", "6M", "-maxrate", "6M"],
+}
+
+# Consumer GPUs limit concurrent encode sessions, so segments are encoded
+# by fewer workers when a hardware encoder is in use
+HARDWARE_ENCODER_MAX_WORKERS = 2
+
+@functools.lru_cache(maxsize=1)
+def select_video_codec() -> str:
+    """
+    Return the fastest H.264 encoder that works on this machine.
+    
+    ffmpeg builds often list hardware encoders whose device is missing, so each
+    candidate is confirmed with a tiny test encode. Falls back to libx264.
+    """
+    logger = logging.getLogger(__name__)
+    ffmpeg = get_setting("FFMPEG_BINARY")
+    
+    try:
+        encoders = subprocess.run([ffmpeg, "-hide_banner", "-encoders"],
+                                  capture_output=True, text=True, timeout=30).stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"Could not list ffmpeg encoders, using {SOFTWARE_CODEC}: {e}")
+        return SOFTWARE_CODEC
+    
+    for codec in HARDWARE_CODECS:
+        if f" {codec} " not in encoders:
+            continue
+        
+        try:
+            result = subprocess.run(
+                [ffmpeg, "-hide_banner", "-loglevel", "error",
+                 "-f", "lavfi", "-i", "color=size=256x256:rate=30:duration=0.1",
+                 "-c:v", codec, "-pix_fmt", "yuv420p", "-f", "null", "-"],
+                capture_output=True, timeout=30)
+        except (OSError, subprocess.SubprocessError):
+            continue
+        
+        if result.returncode == 0:
+            logger.info(f"Using hardware video encoder {codec}")
+            return codec
+    
+    logger.info(f"No hardware video encoder available, using {SOFTWARE_CODEC}")
+    return SOFTWARE_CODEC
+
 class VideoCompositor:
     def __init__(self, 
                  width: int = 1080, 
                  height: int = 1920, 
                  fps: int = 30,
                  background_manager = None,
-                 text_overlay = None):
+                 text_overlay = None,
+                 codec: Optional[str] = None):
         """
         Initialize the video compositor.
         
@@ -27,35 +105,44 @@ class VideoCompositor:
             fps: Frames per second of the output video
             background_manager: BackgroundManager instance to use
             text_overlay: TextOverlayGenerator instance to use
+            codec: ffmpeg video encoder (defaults to the fastest available H.264 encoder)
         """
         self.width = width
         self.height = height
         self.fps = fps
         self.logger = logging.getLogger(__name__)
         
+        # Probe for a hardware encoder once, up front
+        self.codec = codec or select_video_codec()
+        
         # Define default backgrounds directory - needed for BackgroundManager initialization
-        self.assets_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
-        self.backgrounds_dir = os.path.join(self.assets_dir, "backgrounds")
+        self.assets_dir = ASSETS_DIR
+        self.backgrounds_dir = BACKGROUNDS_DIR
         
         # Fix: Initialize BackgroundManager with backgrounds_dir parameter
         self.background_manager = background_manager or BackgroundManager(self.backgrounds_dir)
         self.text_overlay = text_overlay or TextOverlayGenerator()
         
-        self.logger.info(f"Video compositor initialized ({width}x{height} at {fps} fps)")
+        self.logger.info(f"Video compositor initialized ({width}x{height} at {fps} fps, {self.codec})")
     
     def generate_video(self, 
                        segments: List[Dict[str, Any]], 
                        background_manager: Optional[BackgroundManager] = None,
                        text_overlay: Optional[TextOverlayGenerator] = None,
-                       output_file: str = None) -> str:
+                       output_file: str = None,
+                       max_workers: Optional[int] = None) -> str:
         """
         Generate a video from the given segments.
         
+        Each segment is rendered to its own video file in a worker process,
+        then the segment files are joined into the output video.
+        
         Args:
             segments: List of segment dictionaries with 'text' and 'audio' keys
             background_manager: BackgroundManager instance to use
             text_overlay: TextOverlayGenerator instance to use
             output_file: Path to the output video file
+            max_workers: Maximum number of segments rendered at once (defaults to the CPU count)
             
         Returns:
             Path to the output video file
@@ -68,99 +155,411 @@ class VideoCompositor:
         if not output_file:
             output_file = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}.mp4")
         
-        # Create video clips for each segment
         self.logger.info(f"Creating {len(segments)} video segments")
-        video_clips = []
+        
+        with tempfile.TemporaryDirectory() as work_dir:
+            # Segments are planned lazily, so rendering starts with the first one
+            jobs = self._plan_segments(segments, background_mgr)
+            try:
+                segment_files = self._render_segments(jobs, len(segments), work_dir,
+                                                      background_mgr, text_overlay_gen, max_workers)
+            finally:
+                background_mgr.close_clips()
+            segment_files = [path for path in segment_files if path]
+            
+            if not segment_files:
+                self.logger.error("No valid video clips created")
+                return None
+            
+            if not self._concatenate_segments(segment_files, output_file):
+                return None
+        
+        return output_file
+    
+    def _plan_segments(self,
+                       segments: List[Dict[str, Any]],
+                       background_manager: BackgroundManager) -> Iterator[Dict[str, Any]]:
+        """
+        Choose the background and background start time for each segment.
+        
+        Done in this process so that consecutive segments sharing a
+        background video continue its footage, even when they are rendered
+        by different workers.
+        
+        Args:
+            segments: List of segment dictionaries with 'text' and 'audio' keys
+            background_manager: BackgroundManager instance to use
+            
+        Yields:
+            Render jobs with 'text', 'audio', 'background', 'start' and 'duration' keys
+        """
+        # Playback position and length of each background video
+        bg_cursor = {}
+        bg_durations = {}
+        durations = self._probe_durations([segment['audio'] for segment in segments if 'audio' in segment])
         
         for i, segment in enumerate(segments):
             if 'audio' not in segment:
                 self.logger.warning(f"Segment {i} has no audio, skipping")
                 continue
             
-            clip = self._create_segment_clip(
-                segment, 
-                background_mgr,
-                text_overlay_gen
-            )
+            duration = durations.get(segment['audio'])
+            if duration is None:
+                continue
             
-            if clip:
-                video_clips.append(clip)
+            try:
+                
+                # Get background
+                bg_path = background_manager.get_random_background()
+                
+                if not bg_path or not os.path.exists(bg_path):
+                    self.logger.error(f"Background file not found: {bg_path}")
+                    continue
+                
+                # Use a copy already scaled and cropped to the output size
+                bg_path = background_manager.normalize(bg_path, self.width, self.height)
+                
+                start = 0
+                if os.path.splitext(bg_path)[1].lower() in VIDEO_EXTENSIONS:
+                    # Only the length is needed here, so read it from the file's header
+                    # instead of opening a decoder; readers are opened where frames are rendered
+                    bg_duration = bg_durations.get(bg_path)
+                    if bg_duration is None:
+                        bg_duration = bg_durations[bg_path] = ffmpeg_parse_infos(bg_path)['duration']
+                    start = bg_cursor.get(bg_path, 0) % bg_duration
+                    bg_cursor[bg_path] = start + duration
+                
+                job = {
+                    'text': segment['text'],
+                    'audio': segment['audio'],
+                    'background': bg_path,
+                    'start': start,
+                    'duration': duration,
+                }
+            
+            except Exception as e:
+                self.logger.error(f"Error preparing segment {i}: {e}")
+                continue
+            
+            yield job
+    
+    def _probe_durations(self, audio_paths: List[str]) -> Dict[str, float]:
+        """
+        Return the duration in seconds of each audio file, probed concurrently.
         
-        if not video_clips:
-            self.logger.error("No valid video clips created")
+        Files that can't be read are logged and left out of the result.
+        """
+        def probe(path):
+            try:
+                return _audio_duration(path)
+            except Exception as e:
+                self.logger.error(f"Error reading audio duration of {path}: {e}")
+                return None
+        
+        unique_paths = list(dict.fromkeys(audio_paths))
+        # Probes are file reads or ffprobe subprocesses, so threads overlap them well
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(unique_paths)))) as executor:
+            durations = dict(zip(unique_paths, executor.map(probe, unique_paths)))
+        
+        return {path: duration for path, duration in durations.items() if duration is not None}
+    
+    def _render_segments(self,
+                         jobs: Iterable[Dict[str, Any]],
+                         job_count: int,
+                         work_dir: str,
+                         background_manager: BackgroundManager,
+                         text_overlay: TextOverlayGenerator,
+                         max_workers: Optional[int] = None) -> List[Optional[str]]:
+        """
+        Render each job to its own video file, in parallel where possible.
+        
+        Clips can't be pickled, so each worker process builds its own
+        compositor and renders straight to a file. Jobs are handed to the
+        workers as soon as they are planned, so planning the next segment
+        (probing audio, normalizing its background) overlaps with rendering.
+        
+        Args:
+            jobs: Render jobs from _plan_segments
+            job_count: Upper bound on the number of jobs, used to size the pool
+            work_dir: Directory for the segment video files
+            background_manager: BackgroundManager instance to use
+            text_overlay: TextOverlayGenerator instance to use
+            max_workers: Maximum number of worker processes
+        
+        Returns:
+            Paths to the segment files, in job order (None for failed segments)
+        """
+        def output_path(index):
+            return os.path.join(work_dir, f"segment_{index:04d}.mp4")
+        
+        cpu_count = os.cpu_count() or 1
+        workers = max(1, min(max_workers or cpu_count, job_count))
+        if self.codec != SOFTWARE_CODEC:
+            workers = min(workers, HARDWARE_ENCODER_MAX_WORKERS)
+        
+        # Share the cores between the encoders running at once instead of
+        # letting every ffmpeg size its thread pool to the whole machine
+        threads = max(2, cpu_count // workers)
+        
+        # Jobs already taken from the iterator and their pool futures, kept for
+        # the sequential fallback
+        planned = []
+        futures = []
+        
+        if workers > 1:
+            try:
+                # Spawn fresh workers rather than forking, so they don't inherit
+                # this process's open ffmpeg readers or logging handlers
+                with ProcessPoolExecutor(max_workers=workers,
+                                         mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=_init_worker,
+                                         initargs=(self.width, self.height, self.fps, self.codec,
+                                                   background_manager.backgrounds_dir,
+                                                   text_overlay.font_path, text_overlay.font_size,
+                                                   text_overlay.text_color, worker_logging.get_log_queue(),
+                                                   logging.getLogger().level)) as executor:
+                    for job in jobs:
+                        planned.append(job)
+                        futures.append(executor.submit(_worker_render_segment, job,
+                                                       output_path(len(futures)), threads))
+                    return [future.result() for future in futures]
+            except Exception as e:
+                self.logger.error(f"Error in parallel segment rendering, falling back to sequential: {e}")
+        
+        # Keep whatever the pool finished and render only the remaining jobs here
+        paths = []
+        for i, job in enumerate(itertools.chain(planned, jobs)):
+            future = futures[i] if i < len(futures) else None
+            if future is not None and future.done() and not future.cancelled() and future.exception() is None:
+                paths.append(future.result())
+            else:
+                paths.append(self._render_segment(job, output_path(i), background_manager, text_overlay,
+                                                  max(2, cpu_count)))
+        return paths
+    
+    def _render_segment(self,
+                        job: Dict[str, Any],
+                        output_path: str,
+                        background_manager: BackgroundManager,
+                        text_overlay: TextOverlayGenerator,
+                        threads: Optional[int] = None) -> Optional[str]:
+        """
+        Render a single segment to a video file.
+        
+        Args:
+            job: Render job from _plan_segments
+            output_path: Path of the segment video file to write
+            background_manager: BackgroundManager instance to use
+            text_overlay: TextOverlayGenerator instance to use
+            threads: Number of encoder threads (ffmpeg's default if None)
+            
+        Returns:
+            output_path, or None if the segment failed
+        """
+        clip = self._create_segment_clip(job, background_manager, text_overlay)
+        if not clip:
+            return None
+        
+        try:
+            # moviepy passes its preset to every encoder; leave hardware encoders on
+            # its default, their own preset is set through HARDWARE_CODEC_PARAMS
+            preset = SOFTWARE_CODEC_PRESET if self.codec == SOFTWARE_CODEC else "medium"
+            # Keep moviepy's scratch audio next to the segment (in the run's work
+            # directory) rather than in the current working directory
+            clip.write_videofile(output_path, fps=self.fps, codec=self.codec, audio_codec="aac", preset=preset,
+                                 temp_audiofile=os.path.splitext(output_path)[0] + "_audio.m4a",
+                                 threads=threads, ffmpeg_params=_codec_params(self.codec), logger=None)
+            return output_path
+        except Exception as e:
+            self.logger.error(f"Error rendering segment: {e}")
             return None
+        finally:
+            # Only the segment's audio is closed here: the video reader is shared
+            # with the background clip cached by BackgroundManager.get_or_open,
+            # which BackgroundManager.close_clips closes once rendering is done
+            clip.audio.close()
+    
+    def _concatenate_segments(self, segment_files: List[str], output_file: str) -> bool:
+        """
+        Join the rendered segment files into the output video.
         
-        # Concatenate all clips
+        Every segment is encoded with the same codec and settings, so ffmpeg's
+        concat demuxer can copy the streams into the output without re-encoding.
+        
+        Returns:
+            True if the output video was written
+        """
         self.logger.info("Concatenating video clips")
-        final_clip = concatenate_videoclips(video_clips, method="compose")
+        list_path = os.path.join(os.path.dirname(segment_files[0]), "segments.txt")
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for path in segment_files:
+                # Quote for the concat demuxer: ' is written as '\''
+                escaped = path.replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
         
         # Write the final video
         self.logger.info(f"Writing video to {output_file}")
-        final_clip.write_videofile(output_file, fps=self.fps, codec="libx264")
-        
-        # Close all clips
-        for clip in video_clips:
-            clip.close()
-        final_clip.close()
-        
-        return output_file
+        try:
+            subprocess.run([get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+                            "-f", "concat", "-safe", "0", "-i", list_path,
+                            "-c", "copy", "-movflags", "+faststart", output_file],
+                           check=True, capture_output=True, text=True)
+            return True
+        except subprocess.CalledProcessError as e:
+            self.logger.error(f"Error concatenating video segments: {e.stderr.strip()}")
+            return False
+        except OSError as e:
+            self.logger.error(f"Error running ffmpeg: {e}")
+            return False
     
     def _create_segment_clip(self, 
-                            segment: Dict[str, Any],
+                            job: Dict[str, Any],
                             background_manager: BackgroundManager,
-                            text_overlay: TextOverlayGenerator) -> Optional[CompositeVideoClip]:
+                            text_overlay: TextOverlayGenerator) -> Optional[VideoClip]:
         """
         Create a video clip for a single segment.
         
         Args:
-            segment: Segment dictionary with 'text' and 'audio' keys
+            job: Render job from _plan_segments
             background_manager: BackgroundManager instance to use
             text_overlay: TextOverlayGenerator instance to use
             
         Returns:
-            CompositeVideoClip for the segment or None if failed
+            VideoClip for the segment or None if failed
         """
         try:
-            # Load audio
-            audio_clip = AudioFileClip(segment['audio'])
-            duration = audio_clip.duration
-            
-            # Get background
-            bg_path = background_manager.get_random_background()
-            
-            if not bg_path or not os.path.exists(bg_path):
-                self.logger.error(f"Background file not found: {bg_path}")
-                return None
+            # Load audio; the segment length is the one the background window was
+            # planned with, so consecutive segments' footage lines up exactly
+            audio_clip = AudioFileClip(job['audio'])
+            duration = job['duration']
+            bg_path = job['background']
             
             # Create background clip
             bg_clip = None
-            if bg_path.endswith(('.mp4', '.mov', '.avi')):
-                bg_clip = VideoFileClip(bg_path).loop(duration=duration)
-            elif bg_path.endswith(('.png', '.jpg', '.jpeg')):
+            ext = os.path.splitext(bg_path)[1].lower()
+            if ext in VIDEO_EXTENSIONS:
+                # Normalized backgrounds already have the output size; anything
+                # else is scaled to the output height by ffmpeg while decoding
+                base = background_manager.get_or_open(bg_path, self.height)
+                start = job['start']
+                if start + duration <= base.duration:
+                    bg_clip = base.subclip(start, start + duration)
+                else:
+                    # Not enough footage left: wrap around to the beginning
+                    bg_clip = base.fl_time(lambda t: (start + t) % base.duration).set_duration(duration)
+            elif ext in IMAGE_EXTENSIONS:
                 bg_clip = ImageClip(bg_path).set_duration(duration)
             else:
                 self.logger.error(f"Unsupported background file format: {bg_path}")
                 return None
             
-            # Resize and crop background to fit dimensions
-            bg_clip = bg_clip.resize(height=self.height)
-            bg_clip = bg_clip.crop(x_center=bg_clip.w/2, y_center=bg_clip.h/2, 
-                                  width=self.width, height=self.height)
+            # Resize and crop background to fit dimensions (only needed if normalization failed)
+            if bg_clip.h != self.height:
+                bg_clip = bg_clip.resize(height=self.height)
+            if tuple(bg_clip.size) != (self.width, self.height):
+                bg_clip = bg_clip.crop(x_center=bg_clip.w/2, y_center=bg_clip.h/2, 
+                                      width=self.width, height=self.height)
             
-            # Create text overlay
-            text_img = text_overlay.create_text_overlay(segment['text'], self.width, self.height)
-            text_clip = ImageClip(text_img).set_duration(duration)
+            # Cached per text, so repeated strings are only rasterized once
+            text_img = text_overlay.create_text_overlay_cached(job['text'], self.width, self.height)
             
-            # Combine background and text
-            composite_clip = CompositeVideoClip([bg_clip, text_clip])
+            # Combine background and text; an ImageClip background is blended
+            # once, a video background once per frame
+            composite_clip = bg_clip.fl_image(_overlay_blender(text_img))
             
-            # Add audio
-            composite_clip = composite_clip.set_audio(audio_clip)
+            # Add audio, never reading past its end if it's a hair shorter than planned
+            composite_clip = composite_clip.set_audio(audio_clip.set_duration(min(duration, audio_clip.duration)))
             
             return composite_clip
             
         except Exception as e:
-            self.logger.error(f"Error creating segment clip: {e}")
-            import traceback
-            self.logger.error(traceback.format_exc())
-            return None
\ No newline at end of file
+            self.logger.exception(f"Error creating segment clip: {e}")
+            return None
+
+def _audio_duration(path: str) -> float:
+    """
+    Return the duration of an audio file in seconds.
+    
+    WAV files (all Piper output, and pyttsx3 output on most platforms) are
+    read from their header directly. Anything else is probed with ffprobe if
+    it's installed, and otherwise opened with moviepy.
+    """
+    try:
+        with wave.open(path, 'rb') as wav_file:
+            return wav_file.getnframes() / wav_file.getframerate()
+    except (wave.Error, EOFError):
+        pass
+    
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe:
+        result = subprocess.run([ffprobe, "-v", "error", "-show_entries", "format=duration",
+                                 "-of", "default=noprint_wrappers=1:nokey=1", path],
+                                capture_output=True, text=True)
+        try:
+            return float(result.stdout)
+        except ValueError:
+            pass
+    
+    audio_clip = AudioFileClip(path)
+    try:
+        return audio_clip.duration
+    finally:
+        audio_clip.close()
+
+def _overlay_blender(overlay: np.ndarray):
+    """
+    Return a function that alpha-blends an RGBA overlay onto RGB frames.
+    
+    The overlay is fixed for a whole segment, so its alpha and premultiplied
+    colors are computed once, and only the rows the text covers are blended.
+    This replaces a CompositeVideoClip, which blits every layer over the
+    full frame for each frame.
+    """
+    rows = np.flatnonzero(overlay[:, :, 3].any(axis=1))
+    if rows.size == 0:
+        return lambda frame: frame
+    
+    top, bottom = rows[0], rows[-1] + 1
+    alpha = overlay[top:bottom, :, 3:4].astype(np.float32) / 255
+    foreground = overlay[top:bottom, :, :3] * alpha
+    inverse_alpha = 1 - alpha
+    
+    def blend(frame):
+        # Frames can be shared with the reader, so never blend in place
+        frame = frame.copy()
+        band = frame[top:bottom]
+        band[...] = band * inverse_alpha + foreground + 0.5
+        return frame
+    
+    return blend
+
+def _codec_params(codec: str) -> List[str]:
+    """Extra ffmpeg parameters for the given encoder."""
+    if codec == SOFTWARE_CODEC:
+        return list(SOFTWARE_CODEC_PARAMS)
+    
+    # moviepy only requests yuv420p for libx264; hardware encoders would
+    # otherwise pick a 4:4:4 or RGB format many players can't decode
+    return ["-pix_fmt", "yuv420p"] + HARDWARE_CODEC_PARAMS.get(codec, [])
+
+# Compositor owned by a segment rendering worker process
+_worker_compositor = None
+
+def _init_worker(width: int, height: int, fps: int, codec: str, backgrounds_dir: str,
+                 font_path: str, font_size: int, text_color, log_queue=None, log_level: int = logging.INFO):
+    """Create the compositor for a segment rendering worker process."""
+    global _worker_compositor
+    worker_logging.install_queue_handler(log_queue, log_level)
+    _worker_compositor = VideoCompositor(width, height, fps, codec=codec,
+                                         background_manager=BackgroundManager(backgrounds_dir),
+                                         text_overlay=TextOverlayGenerator(font_path, font_size, text_color))
+    
+    # Pool workers exit without running atexit handlers; a multiprocessing
+    # finalizer closes the worker's cached background readers on shutdown
+    multiprocessing.util.Finalize(None, _worker_compositor.background_manager.close_clips, exitpriority=10)
+
+def _worker_render_segment(job: Dict[str, Any], output_path: str, threads: int) -> Optional[str]:
+    """Render a segment to output_path using the worker process's compositor."""
+    compositor = _worker_compositor
+    return compositor._render_segment(job, output_path,
+                                      compositor.background_manager, compositor.text_overlay, threads)
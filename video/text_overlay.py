@@ -1,25 +1,18 @@
-# Step 1: First, let's look at the entire file structure and find all instances of getsize
-
-# Run these commands in the terminal to find all instances:
-# cd C:\Users\vk\Desktop\Reddit Story Generator
-# findstr /s "getsize" video\text_overlay.py
-
-# Or use this Python script to find all instances:
-import re
-
-with open(r"C:\Users\vk\Desktop\Reddit Story Generator\video\text_overlay.py", "r") as file:
-    content = file.read()
-    
-matches = re.findall(r"\.getsize\(", content)
-print(f"Found {len(matches)} instances of .getsize()")
-
-# Step 2: Create a complete replacement for text_overlay.py
-# Replace the entire file content with this updated version:
-
 import os
-import textwrap
+import functools
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
+@functools.lru_cache(maxsize=64)
+def _get_font(font_path, font_size):
+    """Load a TrueType font, sharing one FreeType face per (path, size) across instances."""
+    return ImageFont.truetype(font_path, font_size)
+
+@functools.lru_cache(maxsize=4096)
+def _word_width(font, word):
+    """Return the advance width of a word, measuring each distinct (font, word) once."""
+    return font.getlength(word)
+
 class TextOverlayGenerator:
     def __init__(self, font_path=None, font_size=40, text_color=(255, 255, 255)):
         """Initialize the text overlay generator."""
@@ -28,81 +21,103 @@ class TextOverlayGenerator:
         
         self.font_path = font_path
         self.font_size = font_size
-        self.font = ImageFont.truetype(font_path, font_size)
+        self.font = _get_font(font_path, font_size)
         self.text_color = text_color
         self.padding = 50
         self.line_spacing = 10
         
+        # Line height is fixed for a font (ascent + descent), so it's measured once
+        ascent, descent = self.font.getmetrics()
+        self.line_height = ascent + descent
+        self.space_width = self.font.getlength(' ')
+        
+        # Rendered overlays keyed by (text, width, height); font settings are fixed per instance
+        self._render_overlay_cached = functools.lru_cache(maxsize=256)(self._render_overlay_array)
+        
         # Log initialization
         import logging
         self.logger = logging.getLogger(__name__)
         self.logger.info("Text overlay generator initialized")
     
-    def get_font_dimensions(self, text):
-        """Helper function to get text dimensions that works with both old and new Pillow versions"""
-        try:
-            # For older Pillow versions
-            return self.font.getsize(text)
-        except AttributeError:
-            # For newer Pillow versions (9.2.0+)
-            bbox = self.font.getbbox(text)
-            width = bbox[2] - bbox[0]  # right - left
-            height = bbox[3] - bbox[1]  # bottom - top
-            return width, height
-    
     def create_text_overlay(self, text, width, height):
         """Create a text overlay image with the specified text."""
-        # Create a transparent image
-        img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
         # Calculate the maximum width for text
         max_text_width = width - (self.padding * 2)
         
         # Wrap text to fit within the width
         wrapped_text = self._wrap_text(text, max_text_width)
+        line_widths = [int(self.font.getlength(line)) for line in wrapped_text]
         
-        # Calculate total text height
-        total_height = 0
-        for line in wrapped_text:
-            line_width, line_height = self.get_font_dimensions(line)
-            total_height += line_height + self.line_spacing
+        # Calculate total text height (no spacing after the last line)
+        total_height = max(len(wrapped_text) * (self.line_height + self.line_spacing) - self.line_spacing, 0)
         
-        # Remove last line spacing
-        if total_height > 0:
-            total_height -= self.line_spacing
-        
-        # Calculate starting y position to center text vertically
-        y = (height - total_height) // 2
+        # Draw the text into an image only as large as the text block (plus a
+        # margin for glyphs that overhang their advance width) instead of the
+        # whole frame, so the rasterizer only touches the pixels it needs
+        margin = self.font_size // 2
+        block_width = max(line_widths, default=0)
+        block = Image.new('RGBA', (block_width + margin * 2, total_height + margin * 2), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(block)
         
         # Draw each line of text
-        for line in wrapped_text:
-            line_width, line_height = self.get_font_dimensions(line)
-            x = (width - line_width) // 2  # Center text horizontally
+        y = margin
+        for line, line_width in zip(wrapped_text, line_widths):
+            x = margin + (block_width - line_width) // 2  # Center text horizontally
             draw.text((x, y), line, font=self.font, fill=self.text_color)
-            y += line_height + self.line_spacing
+            y += self.line_height + self.line_spacing
+        
+        # Create a transparent image and place the text block at its center;
+        # the frame is empty, so a plain paste (no alpha blending) is enough
+        img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+        img.paste(block, ((width - block_width) // 2 - margin, (height - total_height) // 2 - margin))
         
         return img
     
+    def create_text_overlay_cached(self, text, width, height):
+        """
+        Return the text overlay as a read-only RGBA array, rendering it only once.
+        
+        Text is wrapped on whitespace, so runs of whitespace don't change the
+        rendered image; they are collapsed before the cache lookup so strings
+        differing only in spacing share one entry.
+        """
+        return self._render_overlay_cached(' '.join(text.split()), width, height)
+    
+    def _render_overlay_array(self, text, width, height):
+        """
+        Render a text overlay as a read-only RGBA array.
+        
+        Backs create_text_overlay_cached, so identical text (e.g. a repeated
+        title) is only rasterized once. The array is shared between callers,
+        which is why it is made read-only.
+        """
+        pixels = np.asarray(self.create_text_overlay(text, width, height))
+        pixels.flags.writeable = False
+        return pixels
+    
     def _wrap_text(self, text, max_width):
         """Wrap text to fit within max_width."""
         words = text.split()
         wrapped_lines = []
         current_line = []
+        current_width = 0
         
         for word in words:
-            # Try adding the word to the current line
-            test_line = ' '.join(current_line + [word])
-            line_width, _ = self.get_font_dimensions(test_line)
+            # Width of the current line with this word added; advance widths
+            # add up, so the line never has to be measured as a whole
+            word_width = _word_width(self.font, word)
+            line_width = current_width + self.space_width + word_width if current_line else word_width
             
             if line_width <= max_width:
                 # Word fits, add it to the current line
                 current_line.append(word)
+                current_width = line_width
             else:
                 # Word doesn't fit, start a new line
                 if current_line:
                     wrapped_lines.append(' '.join(current_line))
                     current_line = [word]
+                    current_width = word_width
                 else:
                     # If the word is too long by itself, force it onto its own line
                     wrapped_lines.append(word)
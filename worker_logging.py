@@ -0,0 +1,27 @@
+"""
+Logging for multiprocessing pool workers.
+
+Spawned workers start with an unconfigured root logger, so their records
+would be dropped. main.setup_logging sends records through a QueueHandler
+onto a multiprocessing queue; pool initializers install a QueueHandler on
+that same queue so worker records reach the main process's listener.
+"""
+import logging
+import multiprocessing.queues
+from logging.handlers import QueueHandler
+
+def get_log_queue():
+    """Return the multiprocessing queue the root logger forwards records to, or None."""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, QueueHandler) and isinstance(handler.queue, multiprocessing.queues.Queue):
+            return handler.queue
+    return None
+
+def install_queue_handler(log_queue, level=logging.INFO):
+    """Forward this process's log records to log_queue; does nothing if it is None."""
+    if log_queue is None:
+        return
+    
+    root = logging.getLogger()
+    root.handlers[:] = [QueueHandler(log_queue)]
+    root.setLevel(level)